@@ -1,15 +1,113 @@
 import os
  #to interact with the operating system 
 import json     #json module
+import gzip     # compressed file formats
+import lzma
+import bz2
 import re       # is for regular expressions
+import hashlib  # for project fingerprints
+import heapq    # bounded heaps for top-k queries
+import math
+import random   # reservoir sampling
 from datetime import datetime   # for date
 import matplotlib.pyplot as plt     #to create charts
+try:
+    import zstandard    # optional, only needed for .zst files
+except ImportError:
+    zstandard = None
 
 # These regex pattern is used to validate user inputs for states, money and periods.
 STATE_REGEX = re.compile(r'^[A-Za-z ]+$')    # Only letters and spaces
 MONEY_REGEX = re.compile(r'^\$\d+\.\d{2}m$')    ## Format
 PERIOD_REGEX = re.compile(r'^\d{2}/\d{2}/\d{4}\s[–-]\s\d{2}/\d{2}/\d{4}$')
 
+# Compressed file support: extension used when writing, magic bytes when reading
+COMPRESSED_EXTS = {'.gz': 'gzip', '.xz': 'lzma', '.lzma': 'lzma', '.bz2': 'bz2', '.zst': 'zstd'}
+MAGIC_BYTES = {
+    'gzip': b'\x1f\x8b',
+    'lzma': b'\xfd7zXZ\x00',
+    'bz2': b'BZh',
+    'zstd': b'\x28\xb5\x2f\xfd',
+}
+# A number or literal cut off by the end of a read chunk, e.g. '1.' or 'nul'
+PARTIAL_TOKEN_REGEX = re.compile(r'[\w.+-]*')
+
+def open_text(path, mode='r'):
+    """
+    Open a text file, transparently handling gzip, lzma, bz2 or zstd compression.
+    Reading detects the format from the file header, writing from the extension.
+    """
+    mode = mode.replace('t', '').replace('b', '') + 't'
+    if 'r' in mode:
+        with open(path, 'rb') as f:
+            head = f.read(6)
+        codec = next((c for c, magic in MAGIC_BYTES.items() if head.startswith(magic)), None)
+    else:
+        codec = COMPRESSED_EXTS.get(os.path.splitext(path)[1].lower())
+
+    if codec == 'gzip':
+        return gzip.open(path, mode, encoding='utf-8')
+    if codec == 'lzma':
+        return lzma.open(path, mode, encoding='utf-8')
+    if codec == 'bz2':
+        return bz2.open(path, mode, encoding='utf-8')
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("The 'zstandard' package is required for .zst files.")
+        return zstandard.open(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+def find_data_file(path):    # Returns path or its first existing compressed variant
+    if os.path.exists(path):
+        return path
+    for ext in COMPRESSED_EXTS:
+        if os.path.exists(path + ext):
+            return path + ext
+    return None
+
+def iter_json_records(f, chunk_size=65536):
+    """
+    Yield records one at a time from a JSON array or JSON-lines stream,
+    reading in chunks so the whole file is never held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+    in_array = None
+    while True:
+        # Skip whitespace and the commas between array items
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+        if pos < len(buf):
+            if in_array is None:
+                in_array = buf[pos] == '['
+                if in_array:
+                    pos += 1
+                    continue
+            if in_array and buf[pos] == ']':
+                return
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                # Only a record cut off by the end of the buffer needs more data,
+                # anything else is malformed and is reported straight away
+                truncated = (e.msg.startswith('Unterminated string')
+                             or PARTIAL_TOKEN_REGEX.fullmatch(buf, e.pos))
+                if eof or not truncated:
+                    raise
+            else:
+                yield obj
+                pos = end
+                continue
+        elif eof:
+            return
+        # Need more data, drop what has already been consumed
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+
+def normalise_text(text):    # Lower case, commas and repeated whitespace collapsed
+    return ' '.join(re.split(r'[\s,]+', str(text).casefold())).strip()
+
 #Main Project Class
 class Project:
    # Base class for ARENA projects.
@@ -21,6 +119,7 @@ class Project:
         self.funding = funding       
         self.total_cost = total_cost 
         self.period = period        
+        self.id = None      # Stable ID, kept by ProjectManager across edits
 
     def to_dict(self): #Serialize the project to a dictionary for JSON export.
         return {
@@ -31,7 +130,8 @@ class Project:
             'Location': self.location,
             'Funding': self.funding,
             'Total Cost': self.total_cost,
-            'Period': self.period
+            'Period': self.period,
+            'ID': self.project_id()
         }
     
     @staticmethod
@@ -39,16 +139,18 @@ class Project:
     def from_dict(d):
     # I use BiomethaneProject as a subclass of Project
         if d.get('type', 'Project') == 'BiomethaneProject':
-            return BiomethaneProject(
+            proj = BiomethaneProject(
             d['Name'], d['Category'], d['State'], d['Location'],
             d['Funding'], d['Total Cost'], d['Period'],
             co2_output=d.get('CO2 Output')
         )
         else:
-            return Project(
+            proj = Project(
             d['Name'], d['Category'], d['State'], d['Location'],
             d['Funding'], d['Total Cost'], d['Period']
         )
+        proj.id = d.get('ID')
+        return proj
 
     def display(self):  # Display project attributes in a readable format for the user
         print(f"Name: {self.name}\n"
@@ -62,6 +164,43 @@ class Project:
     def funding_value(self):    # Convert funding string to a float
         return float(self.funding.strip('$m'))
 
+    def total_cost_value(self):     # Convert total cost string to a float
+        return float(self.total_cost.strip('$m'))
+
+    def funding_ratio(self):    # Share of the total cost covered by funding
+        return self.funding_value() / self.total_cost_value()
+
+    def duration_days(self):    # Number of days between the period start and end
+        start_str, end_str = [d.strip() for d in re.split('[–-]', self.period)]
+        start = datetime.strptime(start_str, '%d/%m/%Y')
+        end = datetime.strptime(end_str, '%d/%m/%Y')
+        return (end - start).days
+
+    def fingerprint(self):
+        """
+        Hash of the normalised name, location and start year of the period.
+        Only the start year is used since the .txt format keeps nothing more.
+        """
+        year = re.search(r'\d{4}', str(self.period))
+        key = '|'.join([normalise_text(self.name), normalise_text(self.location),
+                        year.group() if year else ''])
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+    def project_id(self):
+        """
+        Stable ID for change feeds, saved with the project. Projects without one
+        get a hash of the normalised name, category, location and full period.
+        """
+        if self.id:
+            return self.id
+        period = re.sub('[–-]', '-', str(self.period))
+        key = '|'.join(normalise_text(v) for v in (self.name, self.category, self.location, period))
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+    def content_hash(self):     # Hash of every exported field, changes on any edit
+        data = json.dumps(self.to_dict(), sort_keys=True)
+        return hashlib.blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
 # Subclass for Polymorphism 
 class BiomethaneProject(Project):
     def __init__(self, name, category, state, location, funding, total_cost, period, co2_output=None):
@@ -73,6 +212,217 @@ class BiomethaneProject(Project):
         d['CO2 Output'] = self.co2_output
         return d
 
+# Scores available to the ranking queries
+RANKING_KEYS = {
+    'funding': Project.funding_value,
+    'total_cost': Project.total_cost_value,
+    'funding_ratio': Project.funding_ratio,
+    'duration': Project.duration_days,
+}
+
+# Approximate analytics for very large registries
+# Every approximate result comes with a margin at this confidence level
+CONFIDENCE = 0.95
+Z_SCORE = 1.96  # normal quantile for CONFIDENCE
+
+def sample_estimate(total, total_sq, sample_size, population):
+    """
+    Scale a sum over a uniform sample up to the population.
+    total_sq is the sum of squared values, for counts it equals total.
+    Returns (estimate, error) with the error at the CONFIDENCE level.
+    """
+    if not sample_size:
+        return 0, 0
+    mean = total / sample_size
+    variance = max(total_sq / sample_size - mean * mean, 0)
+    # Finite population correction, the error is 0 when everything is sampled
+    fpc = math.sqrt((population - sample_size) / (population - 1)) if population > 1 else 0
+    return population * mean, Z_SCORE * population * math.sqrt(variance / sample_size) * fpc
+
+def hash64(item):     # 64-bit hash of a string for HyperLogLog
+    digest = hashlib.blake2b(str(item).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+class CountMinSketch:
+    """
+    Approximate frequency counts in fixed memory. Estimates never undercount and
+    overcount by at most error_bound() with probability CONFIDENCE.
+    """
+    CELL_CACHE_SIZE = 4096  # cells of frequent items such as states are remembered
+
+    def __init__(self, width=2048, depth=5):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.rows = [[0] * width for _ in range(depth)]
+        self.cell_cache = {}
+
+    def _cells(self, item):
+        cells = self.cell_cache.get(item)
+        if cells is None:
+            # One 128-bit hash split in two, rows use h1 + i * h2
+            digest = hashlib.blake2b(str(item).encode('utf-8'), digest_size=16).digest()
+            h1, h2 = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+            cells = [(h1 + i * h2) % self.width for i in range(self.depth)]
+            if len(self.cell_cache) < self.CELL_CACHE_SIZE:
+                self.cell_cache[item] = cells
+        return cells
+
+    def add(self, item, count=1):   # A negative count undoes an earlier add
+        self.total += count
+        for row, cell in zip(self.rows, self._cells(item)):
+            row[cell] += count
+
+    def estimate(self, item):
+        return min(row[cell] for row, cell in zip(self.rows, self._cells(item)))
+
+    def error_bound(self):
+        # Each row overcounts by more than c * total / width with probability
+        # at most 1/c (Markov), so all rows do with probability c^-depth
+        c = (1 - CONFIDENCE) ** (-1 / self.depth)
+        return c * self.total / self.width
+
+class HyperLogLog:
+    """
+    Approximate count of distinct items using 2**precision registers.
+    Relative standard error is about 1.04 / sqrt(2**precision).
+    """
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.registers = [0] * (1 << precision)
+
+    def add(self, item):
+        h = hash64(item)
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small sets
+        return estimate
+
+    def error_bound(self):     # Margin at the CONFIDENCE level
+        return Z_SCORE * 1.04 / math.sqrt(len(self.registers)) * self.count()
+
+class ReservoirSample:
+    """
+    Uniform random sample of fixed size from a stream (Algorithm R).
+    """
+    def __init__(self, size=10000, seed=None):
+        self.size = size
+        self.seen = 0
+        self.items = []
+        self.slots = {}     # id(item) -> index in items, so replace() is O(1)
+        self.rng = random.Random(seed)
+
+    def add(self, item):
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.slots[id(item)] = len(self.items)
+            self.items.append(item)
+        else:
+            i = self.rng.randrange(self.seen)
+            if i < self.size:
+                self._put(i, item)
+
+    def _put(self, i, item):
+        old = self.items[i]
+        if self.slots.get(id(old)) == i:
+            del self.slots[id(old)]
+        self.items[i] = item
+        self.slots[id(item)] = i
+
+    def replace(self, old, new):    # Keeps the sample in step when an item is edited
+        i = self.slots.get(id(old))
+        if i is not None:
+            self._put(i, new)
+
+class ApproxStats:
+    """
+    Sketches of the registry, built by ProjectManager on first use and then kept
+    up to date so approximate breakdowns are answered without scanning every project.
+    Results are (estimate, error) pairs, all errors at the CONFIDENCE level.
+    """
+    NORMALISE_CACHE_SIZE = 4096
+
+    def __init__(self, sample_size=10000, width=2048, depth=5, precision=12, seed=None):
+        self.count = 0
+        self.sample = ReservoirSample(sample_size, seed)
+        self.states = CountMinSketch(width, depth)
+        self.categories = CountMinSketch(width, depth)
+        self.locations = HyperLogLog(precision)
+        self.keys = []      # normalised (state, category) per index, to undo on edits
+        self.normalised = {}
+
+    def _normalise(self, text):     # normalise_text with a cache, states and categories repeat
+        key = self.normalised.get(text)
+        if key is None:
+            key = normalise_text(text)
+            if len(self.normalised) < self.NORMALISE_CACHE_SIZE:
+                self.normalised[text] = key
+        return key
+
+    def add(self, proj):
+        state, category = self._normalise(proj.state), self._normalise(proj.category)
+        self.count += 1
+        self.keys.append((state, category))
+        self.sample.add(proj)
+        self.states.add(state)
+        self.categories.add(category)
+        self.locations.add(normalise_text(proj.location))
+
+    def replace(self, index, old, new):
+        """
+        Update the sketches for the project at index. The stored keys are undone
+        rather than old's fields, since old may be new edited in place.
+        """
+        old_state, old_category = self.keys[index]
+        state, category = self._normalise(new.state), self._normalise(new.category)
+        self.keys[index] = (state, category)
+        self.sample.replace(old, new)
+        self.states.add(old_state, -1)
+        self.states.add(state)
+        self.categories.add(old_category, -1)
+        self.categories.add(category)
+        # HyperLogLog cannot forget the old location, so it may overcount after edits
+        self.locations.add(normalise_text(new.location))
+
+    def state_count(self, state):
+        return self.states.estimate(normalise_text(state)), self.states.error_bound()
+
+    def category_count(self, category):
+        return self.categories.estimate(normalise_text(category)), self.categories.error_bound()
+
+    def distinct_locations(self):
+        return self.locations.count(), self.locations.error_bound()
+
+    def scale(self):    # Number of projects each sampled project stands for
+        return self.count / len(self.sample.items) if self.sample.items else 0
+
+    def breakdown(self, attr):
+        """
+        Estimated number of projects per value of attr ('state', 'category', ...)
+        from the sample. Values are normalised like state_count/category_count.
+        """
+        items = self.sample.items
+        counts = {}
+        for p in items:
+            value = normalise_text(getattr(p, attr))
+            counts[value] = counts.get(value, 0) + 1
+        return {value: sample_estimate(c, c, len(items), self.count) for value, c in counts.items()}
+
+def ranking_score(key, proj):   # Parsed value of a ranking key, None if it cannot be parsed
+    try:
+        return RANKING_KEYS[key](proj)
+    except (ValueError, ZeroDivisionError, AttributeError):
+        return None
+
 # -Project Manager Design Pattern
 class ProjectManager:
     """
@@ -85,55 +435,73 @@ class ProjectManager:
         return cls._instance
 
     def __init__(self):
-        if not hasattr(self, 'projects'):
+        if not hasattr(self, '_projects'):
             self.projects = []
             self.txt_file = 'ARENA_projects.txt'    # Path for project text file
             self.json_file = 'ARENA_projects.JSON'  ## Path for JSON file
+            self.changes_file = 'ARENA_changes.jsonl'   # Change feed for downstream systems
+            self.changes = []   # Change feed filled by add_project/modify_project
+            self.stats_options = {}     # ApproxStats settings, see rebuild_stats
 
-    def load_data(self):  #Loads data from JSON or TXT  
-        if os.path.exists(self.json_file):
+    @property
+    def projects(self):
+        return self._projects
+
+    @projects.setter
+    def projects(self, projs):  # Assigning a new list starts tracking its records afresh
+        self._projects = projs
+        self._record_hashes = [self._record_hash(p) for p in projs]
+        self._stats = None
+        self._scores = {}   # ranking key -> parsed score per index, filled on first query
+
+    @staticmethod
+    def _record_hash(proj):
+        """
+        Cheap in-memory hash of a project's fields, used to spot edits.
+        Not stable across runs, content_hash() is used for anything exported.
+        """
+        fields = tuple(v for k, v in vars(proj).items() if k != 'id')
+        try:
+            return hash((type(proj).__name__, fields))
+        except TypeError:   # an unhashable field such as a list
+            return hash(json.dumps([type(proj).__name__, fields], default=str))
+
+    def _sync_records(self):    # Re-tracks the records if the list was changed directly
+        if len(self._record_hashes) != len(self._projects):
+            self._record_hashes = [self._record_hash(p) for p in self._projects]
+            self._stats = None
+            self._scores = {}
+
+    @property
+    def stats(self):    # Sketches for approximate analytics, built on first use
+        self._sync_records()
+        if self._stats is None:
+            self.rebuild_stats(**self.stats_options)
+        return self._stats
+
+    def load_data(self):  #Loads data from JSON or TXT, plain or compressed
+        json_path = find_data_file(self.json_file)
+        txt_path = find_data_file(self.txt_file)
+        # Keep both paths on the files found, so saving updates them rather than
+        # writing a plain copy next to a compressed one
+        self.json_file = json_path or self.json_file
+        self.txt_file = txt_path or self.txt_file
+        if json_path:
             self.load_json()
-        elif os.path.exists(self.txt_file):
+        elif txt_path:
             self.load_txt()
         else:
             print("No data file found.")
 
-    def load_txt(self):  #Imports projects from the .txt format
-        with open(self.txt_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        entries = [e.strip() for e in content.split('Project info:') if e.strip()]
-        for entry in entries:
-            lines = [ln.strip() for ln in entry.splitlines() if ln.strip()]
-            data = {}
-            for line in lines:
-                if ':' in line:
-                    key, val = line.split(':', 1)
-                    data[key.strip()] = val.strip().rstrip(',')
-            try:
-                # raw funding & cost (int), convert to $Xm format
-                raw_funding = float(data['Funding'])
-                raw_cost = float(data['Total Cost'])
-                funding_str = f"${raw_funding/1e6:.2f}m"
-                cost_str = f"${raw_cost/1e6:.2f}m"
-                # Default period based on Year Started
-                year = data['Year Started']
-                period = f"01/01/{year} – 31/12/{year}"
-
-                proj = Project(
-                    name=data['Name'],
-                    category=data['Category'],
-                    state=data['Location'].split(',')[-1].strip(),
-                    location=data['Location'],
-                    funding=funding_str,
-                    total_cost=cost_str,
-                    period=period
-                )
-                self.projects.append(proj)
-            except KeyError:
-                continue
+    def load_txt(self):  #Imports projects from the .txt format, one entry at a time
+        # Sketches and ranking scores are rebuilt on request rather than per loaded record
+        self._stats, self._scores = None, {}
+        with open_text(self.txt_file, 'r') as f:
+            for proj in iter_txt_projects(f):
+                self._append(proj)
 
     def save_txt(self): # Saves all projects to the .txt file
-        with open(self.txt_file, 'w', encoding='utf-8') as f:
+        with open_text(self.txt_file, 'w') as f:
             for p in self.projects:
                 f.write('Project info:\n')
                 f.write(f"Name: {p.name},\n")
@@ -157,21 +525,168 @@ class ProjectManager:
                 f.write(f"Funding: {fund_val},\n")
                 f.write(f"Total Cost: {cost_val}\n\n")
 
-    def load_json(self): #Loads projects from a JSON file
-        with open(self.json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        for item in data:
-            self.projects.append(Project.from_dict(item))
+    def load_json(self): #Streams projects from a JSON (or JSON-lines) file
+        # Sketches and ranking scores are rebuilt on request rather than per loaded record
+        self._stats, self._scores = None, {}
+        with open_text(self.json_file, 'r') as f:
+            for item in iter_json_records(f):
+                self._append(Project.from_dict(item))
+
+    def save_json(self):    # Saves all projects to JSON file, one record per line
+        with open_text(self.json_file, 'w') as f:
+            f.write('[\n')
+            for i, p in enumerate(self.projects):
+                f.write((',\n' if i else '') + json.dumps(p.to_dict()))
+            f.write('\n]\n')
 
-    def save_json(self):    # Saves all projects to JSON file
-        with open(self.json_file, 'w', encoding='utf-8') as f:
-            json.dump([p.to_dict() for p in self.projects], f, indent=4)
+    def _append(self, proj):    # Appends a project and tracks it
+        self._sync_records()
+        self._projects.append(proj)
+        self._record_hashes.append(self._record_hash(proj))
+        if self._stats is not None:
+            self._stats.add(proj)
+        for key, scores in self._scores.items():
+            scores.append(ranking_score(key, proj))
 
     def add_project(self, proj):    #Adds a new project to the project list.
-        self.projects.append(proj)
+        proj.id = proj.project_id()
+        self._append(proj)
+        self._record_change('added', proj)
 
     def modify_project(self, index, proj):      # Replaces an existing project at the given index.
-        self.projects[index] = proj
+        self._sync_records()
+        old = self._projects[index]
+        # The slot keeps its ID, so any edit is reported as 'modified'
+        proj.id = old.project_id()
+        new_hash = self._record_hash(proj)
+        # Compared with the stored hash, so edits made in place are still noticed
+        changed = new_hash != self._record_hashes[index]
+        self._projects[index] = proj
+        self._record_hashes[index] = new_hash
+        if self._stats is not None:
+            self._stats.replace(index, old, proj)
+        for key, scores in self._scores.items():
+            scores[index] = ranking_score(key, proj)
+        if changed:
+            self._record_change('modified', proj)
+
+    def rebuild_stats(self, **options):
+        """
+        Recompute the sketches from the project list. options are passed to
+        ApproxStats and kept for later rebuilds.
+        """
+        self.stats_options = options
+        self._sync_records()
+        stats = ApproxStats(**options)
+        for p in self._projects:
+            stats.add(p)
+        self._stats = stats
+
+    def _record_change(self, op, proj):
+        self.changes.append({
+            'op': op,
+            'id': proj.project_id(),
+            'hash': proj.content_hash(),
+            'project': proj.to_dict()
+        })
+
+    def pop_changes(self):  # Returns the pending change feed and clears it
+        changes, self.changes = self.changes, []
+        return changes
+
+    def export_changes(self, filename=None):
+        """
+        Append the pending changes to a JSON-lines feed file (changes_file by
+        default) and clear them.
+        They are only cleared once the file is written and closed, so a failed
+        export keeps them for the next attempt. Returns the number written.
+        """
+        count = len(self.changes)
+        with open_text(filename or self.changes_file, 'a') as f:
+            for change in self.changes[:count]:
+                f.write(json.dumps(change) + '\n')
+        del self.changes[:count]
+        return count
+
+    def merge_projects(self, projs, on_conflict='replace'):
+        """
+        Upsert projects in one pass, matching duplicates by fingerprint.
+        on_conflict is 'replace', 'keep' or a function(existing, new) -> project.
+        Returns the number of projects added.
+        """
+        if on_conflict not in ('replace', 'keep') and not callable(on_conflict):
+            raise ValueError("on_conflict must be 'replace', 'keep' or a function.")
+        index = {}
+        for i, p in enumerate(self.projects):
+            index.setdefault(p.fingerprint(), i)
+        added = 0
+        for p in projs:
+            key = p.fingerprint()
+            i = index.get(key)
+            if i is None:
+                index[key] = len(self.projects)
+                self.add_project(p)
+                added += 1
+            elif on_conflict == 'replace':
+                self.modify_project(i, p)
+            elif callable(on_conflict):
+                self.modify_project(i, on_conflict(self.projects[i], p))
+        return added
+
+    def import_files(self, paths, on_conflict='replace'):   # Merges JSON/TXT files, plain or compressed
+        added = 0
+        for path in paths:
+            added += self.merge_projects(iter_projects(path), on_conflict)
+        return added
+
+    def top_projects(self, key, k=10, group_by=None, bottom=False, projs=None):
+        """
+        Return the k highest (or lowest with bottom=True) projects by key, best first.
+        key is one of RANKING_KEYS, group_by an attribute such as 'state' or
+        'category', in which case a dict of group -> list is returned. Groups are
+        keyed by the normalised value, matching the case-insensitive find_by_* lookups.
+        Keeps a bounded heap per group, so it costs O(n log k) instead of a full sort.
+        Scores of the managed projects are parsed once and kept up to date by
+        add_project/modify_project. Projects whose value cannot be parsed are skipped.
+        """
+        if key not in RANKING_KEYS:
+            raise ValueError(f"key must be one of {', '.join(RANKING_KEYS)}.")
+        if k <= 0:
+            raise ValueError("k must be positive.")
+        if projs is None:
+            projs, scores = self._projects, self._ranking_scores(key)
+        else:
+            scores = [ranking_score(key, p) for p in projs]
+        sign = -1 if bottom else 1
+        heaps = {}
+        group_names = {}    # raw value -> normalised group, values repeat a lot
+        for seq, (p, score) in enumerate(zip(projs, scores)):
+            if score is None:
+                continue
+            score *= sign
+            group = None
+            if group_by:
+                raw = getattr(p, group_by)
+                group = group_names.get(raw)
+                if group is None:
+                    group = group_names[raw] = normalise_text(raw)
+            heap = heaps.setdefault(group, [])
+            item = (score, -seq, p)    # on ties the earlier project wins
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+        ranked = {g: [p for _, _, p in sorted(h, reverse=True)] for g, h in heaps.items()}
+        if group_by:
+            return ranked
+        return ranked.get(None, [])
+
+    def _ranking_scores(self, key):     # Cached scores for key, parsed on first use
+        self._sync_records()
+        scores = self._scores.get(key)
+        if scores is None:
+            scores = self._scores[key] = [ranking_score(key, p) for p in self._projects]
+        return scores
 
     def find_by_state(self, state):
         return [p for p in self.projects if p.state.lower() == state.lower()]
@@ -179,6 +694,124 @@ class ProjectManager:
     def find_by_category(self, category): # Finds all projects matching the given category
         return [p for p in self.projects if p.category.lower() == category.lower()]
 
+# Importing and merging multiple sources
+def project_from_txt(data):  # Converts one parsed .txt entry into a Project, or None
+    try:
+        # raw funding & cost (int), convert to $Xm format
+        raw_funding = float(data['Funding'])
+        raw_cost = float(data['Total Cost'])
+        funding_str = f"${raw_funding/1e6:.2f}m"
+        cost_str = f"${raw_cost/1e6:.2f}m"
+        # Default period based on Year Started
+        year = data['Year Started']
+        period = f"01/01/{year} – 31/12/{year}"
+
+        return Project(
+            name=data['Name'],
+            category=data['Category'],
+            state=data['Location'].split(',')[-1].strip(),
+            location=data['Location'],
+            funding=funding_str,
+            total_cost=cost_str,
+            period=period
+        )
+    except KeyError:
+        return None
+
+def iter_txt_projects(f):    # Yields projects from an open .txt file, entry by entry
+    data = {}
+    for line in f:
+        line = line.strip()
+        if line.startswith('Project info:'):
+            proj = project_from_txt(data)
+            if proj:
+                yield proj
+            data = {}
+        elif ':' in line:
+            key, val = line.split(':', 1)
+            data[key.strip()] = val.strip().rstrip(',')
+    proj = project_from_txt(data)
+    if proj:
+        yield proj
+
+def iter_projects(path):
+    """
+    Stream projects from a JSON, JSON-lines or .txt file (optionally compressed).
+    The format is detected from the first non-blank character.
+    """
+    with open_text(path, 'r') as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+    with open_text(path, 'r') as f:
+        if first in ('[', '{'):
+            for item in iter_json_records(f):
+                yield Project.from_dict(item)
+        else:
+            yield from iter_txt_projects(f)
+
+def merge_files(paths, out_file, on_conflict='keep'):
+    """
+    Merge and dedupe project files into a JSON-lines file without holding the
+    projects in memory, only their fingerprints.
+    'keep' keeps the first copy in one pass, 'replace' keeps the last copy by
+    reading the inputs twice. Returns the number of projects written.
+    """
+    if on_conflict not in ('replace', 'keep'):
+        raise ValueError("on_conflict must be 'replace' or 'keep' when streaming.")
+    last_seen = {}
+    if on_conflict == 'replace':
+        # First pass: remember where the last copy of each project is
+        pos = 0
+        for path in paths:
+            for p in iter_projects(path):
+                last_seen[p.fingerprint()] = pos
+                pos += 1
+    written = 0
+    seen = set()
+    with open_text(out_file, 'w') as out:
+        pos = 0
+        for path in paths:
+            for p in iter_projects(path):
+                key = p.fingerprint()
+                if on_conflict == 'replace':
+                    keep = last_seen[key] == pos
+                else:
+                    keep = key not in seen
+                    seen.add(key)
+                pos += 1
+                if keep:
+                    out.write(json.dumps(p.to_dict()) + '\n')
+                    written += 1
+    return written
+
+def diff_snapshots(old_file, new_file):
+    """
+    Yield the changes between two snapshot files as change feed entries.
+    Only the old snapshot's IDs and content hashes are kept in memory.
+    If a snapshot repeats an ID, the first copy is used on both sides.
+    """
+    old_hashes = {}
+    for p in iter_projects(old_file):
+        old_hashes.setdefault(p.project_id(), p.content_hash())
+    seen = set()
+    for p in iter_projects(new_file):
+        pid, digest = p.project_id(), p.content_hash()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        old = old_hashes.get(pid)
+        if old is None:
+            op = 'added'
+        elif old != digest:
+            op = 'modified'
+        else:
+            continue
+        yield {'op': op, 'id': pid, 'hash': digest, 'project': p.to_dict()}
+    for pid, digest in old_hashes.items():
+        if pid not in seen:
+            yield {'op': 'removed', 'id': pid, 'hash': digest, 'project': None}
+
 #  Validation Functions 
 def input_with_validation(prompt, validation_func):
     """
@@ -230,16 +863,18 @@ def create_project():
 # Generating Textual Reports and Figures
 def generate_report(projs, filename):
     """
-    Save textual report as JSON lines.
+    Save textual report as JSON lines, compressed if filename ends in .gz/.xz/.bz2/.zst.
     """
-    with open(filename, 'w', encoding='utf-8') as f:
+    with open_text(filename, 'w') as f:
         for p in projs:
             f.write(json.dumps(p.to_dict()) + '\n')
     print(f"Report saved to {filename}.")
 
-def visualize_projects(projs, prefix):
+def visualize_projects(projs, prefix, scale=1):
     """
     three visualization types (bar, pie, line).
+    Pass a sample with scale=stats.scale() to chart approximate totals,
+    drawn with error bars at the CONFIDENCE level.
     """
     if not projs:
         print("No projects to visualize.")
@@ -248,10 +883,16 @@ def visualize_projects(projs, prefix):
     # Bar: count per state
     states = [p.state for p in projs]
 
-    counts = {s: states.count(s) for s in set(states)}
+    approx = scale != 1
+    population = round(len(projs) * scale)
+    suffix = f' (approx., {CONFIDENCE:.0%} margins)' if approx else ''
+    counts, errors = {}, []
+    for s in set(states):
+        counts[s], err = sample_estimate(states.count(s), states.count(s), len(projs), population)
+        errors.append(err)
     plt.figure()
-    plt.bar(counts.keys(), counts.values())
-    plt.title('Projects per State')
+    plt.bar(counts.keys(), counts.values(), yerr=errors if approx else None, capsize=4)
+    plt.title('Projects per State' + suffix)
     plt.xlabel('State')
     plt.ylabel('Count')
     plt.tight_layout()
@@ -261,10 +902,15 @@ def visualize_projects(projs, prefix):
     # Pie: distribution by category
     cats = [p.category for p in projs]
     cat_counts = {c: cats.count(c) for c in set(cats)}
+    labels = list(cat_counts.keys())
+    if approx:
+        # Share margins, the count margins divided by the population
+        labels = [f"{c} (±{sample_estimate(n, n, len(projs), population)[1] / population:.1%})"
+                  for c, n in cat_counts.items()]
     plt.figure()
 
-    plt.pie(cat_counts.values(), labels=cat_counts.keys(), autopct='%1.1f%%')
-    plt.title('Category Distribution')
+    plt.pie(cat_counts.values(), labels=labels, autopct='%1.1f%%')
+    plt.title('Category Distribution' + suffix)
     plt.tight_layout()
     plt.savefig(f"{prefix}_pie.png")
     plt.close()
@@ -272,13 +918,15 @@ def visualize_projects(projs, prefix):
     # Line: funding over years
     try:
         years = sorted(set([int(p.period[-4:]) for p in projs]))
-        year_funds = []
+        year_funds, year_errors = [], []
         for y in years:
-            total = sum(p.funding_value() for p in projs if int(p.period[-4:]) == y)
+            values = [p.funding_value() for p in projs if int(p.period[-4:]) == y]
+            total, err = sample_estimate(sum(values), sum(v * v for v in values), len(projs), population)
             year_funds.append(total)
+            year_errors.append(err)
         plt.figure()
-        plt.plot(years, year_funds, marker='o')
-        plt.title('Total Funding per Year')
+        plt.errorbar(years, year_funds, yerr=year_errors if approx else None, marker='o', capsize=4)
+        plt.title('Total Funding per Year' + suffix)
         plt.xlabel('Year')
         plt.ylabel('Funding (million $)')
         plt.tight_layout()
@@ -316,6 +964,7 @@ def main():
             mgr.add_project(p)
             mgr.save_txt()
             mgr.save_json()
+            mgr.export_changes()
             print("Project added and updated.")
 
         elif choice == '3': # Modify an existing project
@@ -326,6 +975,7 @@ def main():
                     mgr.modify_project(i, create_project())
                     mgr.save_txt()
                     mgr.save_json()
+                    mgr.export_changes()
                     print("Project modified and files updated.")
                 else:
                     print("Invalid index.")
@@ -365,6 +1015,7 @@ def main():
         elif choice in ('X', '7', 'EXIT'):  # Save and exit the program
             mgr.save_txt()
             mgr.save_json()
+            mgr.export_changes()
             print("Data saved. Thank You .")
             break
 
@@ -1,9 +1,12 @@
 import unittest
 import os
 
+import io
 import json
 
-from A3 import Project, BiomethaneProject, ProjectManager
+from A3 import (Project, BiomethaneProject, ProjectManager, open_text, generate_report,
+                iter_json_records,
+                iter_projects, merge_files, diff_snapshots, ApproxStats, HyperLogLog)
 
 class TestProjectSerialization(unittest.TestCase):
      # setUp and tearDown used to prepare clean test data for each test case.
@@ -27,6 +30,10 @@ class TestProjectSerialization(unittest.TestCase):
             os.remove(self.test_json)
         if os.path.exists(self.test_txt):
             os.remove(self.test_txt)
+        for ext in ('.gz', '.xz', '.bz2'):
+            for path in (self.test_json + ext, self.test_txt + ext):
+                if os.path.exists(path):
+                    os.remove(path)
 
     def test_to_dict_and_from_dict(self):
        # Ensures serialization and polymorphic deserialization both work.
@@ -114,5 +121,301 @@ class TestProjectSerialization(unittest.TestCase):
         self.assertEqual(len(mgr.projects), 2)
         self.assertEqual(mgr.projects[1].name, self.proj2.name)
 
+    def test_compressed_json_io(self):
+        # Test saving and loading JSON through each compression format
+        mgr = ProjectManager()
+        for ext in ('.gz', '.xz', '.bz2'):
+            mgr.projects = [self.proj1, self.proj2]
+            mgr.json_file = self.test_json + ext
+            mgr.save_json()
+            with open(mgr.json_file, 'rb') as f:
+                self.assertNotEqual(f.read(1), b'[')  # really compressed
+            mgr.projects = []
+            mgr.load_json()
+            self.assertEqual(len(mgr.projects), 2)
+            self.assertEqual(mgr.projects[1].co2_output, "1500t")
+
+    def test_load_data_detects_compressed_txt(self):
+        # load_data should find the .gz variant when the plain files are missing
+        mgr = ProjectManager()
+        mgr.projects = [self.proj1]
+        mgr.txt_file = self.test_txt + '.gz'
+        mgr.save_txt()
+        mgr.projects = []
+        mgr.json_file = self.test_json
+        mgr.txt_file = self.test_txt
+        mgr.load_data()
+        self.assertEqual(mgr.txt_file, self.test_txt + '.gz')
+        self.assertEqual(len(mgr.projects), 1)
+        self.assertEqual(mgr.projects[0].name, self.proj1.name)
+        # Loading the JSON still points txt_file at the compressed copy
+        mgr.save_json()
+        mgr.projects = []
+        mgr.txt_file = self.test_txt
+        mgr.load_data()
+        self.assertEqual(mgr.json_file, self.test_json)
+        self.assertEqual(mgr.txt_file, self.test_txt + '.gz')
+
+    def test_iter_json_records_chunks_and_errors(self):
+        # Records split across tiny chunks are read, a malformed one fails early
+        records = [self.proj1.to_dict(), self.proj2.to_dict()] * 50
+        text = json.dumps(records, indent=4)
+        self.assertEqual(list(iter_json_records(io.StringIO(text), chunk_size=7)), records)
+        bad = io.StringIO('[{"Name": x},\n' + text[1:])
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_json_records(bad, chunk_size=64))
+        self.assertLess(bad.tell(), 200)   # did not read the rest of the file
+
+    def test_compressed_report_is_json_lines(self):
+        # Reports written to .xz can be read back as JSON lines, and by load_json
+        report = self.test_json + '.xz'
+        generate_report([self.proj1, self.proj2], report)
+        with open_text(report) as f:
+            lines = [json.loads(ln) for ln in f]
+        self.assertEqual([d['Name'] for d in lines], [self.proj1.name, self.proj2.name])
+        mgr = ProjectManager()
+        mgr.projects = []
+        mgr.json_file = report
+        mgr.load_json()
+        self.assertEqual(len(mgr.projects), 2)
+
+    def test_merge_projects_dedupes_txt_and_json(self):
+        # The same project from a .txt export and a JSON export is only kept once
+        mgr = ProjectManager()
+        mgr.projects = [self.proj1]
+        mgr.txt_file = self.test_txt
+        mgr.save_txt()
+        mgr.projects = [self.proj1, self.proj2]
+        mgr.json_file = self.test_json
+        mgr.save_json()
+
+        mgr.projects = []
+        added = mgr.import_files([self.test_json, self.test_txt], on_conflict='keep')
+        self.assertEqual(added, 2)
+        self.assertEqual(len(mgr.projects), 2)
+        self.assertEqual(mgr.projects[0].period, self.proj1.period)  # JSON copy kept
+
+        dup = Project(" solar  demo", "Solar", "New South Wales", "sydney, nsw",
+                      "$9.99m", "$9.99m", "01/06/2023 – 31/12/2023")
+        self.assertEqual(mgr.merge_projects([dup]), 0)
+        self.assertEqual(mgr.projects[0].funding, "$9.99m")  # replaced by default
+        self.assertEqual(mgr.merge_projects([dup], on_conflict=lambda old, new: old), 0)
+        with self.assertRaises(ValueError):
+            mgr.merge_projects([dup], on_conflict='newest')
+
+    def test_merge_files_streaming(self):
+        # Streaming merge keeps the first or the last copy of each project
+        mgr = ProjectManager()
+        mgr.projects = [self.proj1, self.proj2]
+        mgr.json_file = self.test_json
+        mgr.save_json()
+        changed = Project("Solar Demo", "Solar", "New South Wales", "Sydney, NSW",
+                          "$1.00m", "$5.55m", "01/01/2023 – 31/12/2024")
+        mgr.projects = [changed]
+        mgr.txt_file = self.test_txt + '.gz'
+        mgr.save_txt()
+
+        out = self.test_txt + '.bz2'
+        self.assertEqual(merge_files([self.test_json, mgr.txt_file], out), 2)
+        self.assertEqual([p.funding for p in iter_projects(out)], ["$2.25m", "$2.09m"])
+        self.assertEqual(merge_files([self.test_json, mgr.txt_file], out, 'replace'), 2)
+        self.assertEqual([p.funding for p in iter_projects(out)], ["$2.09m", "$1.00m"])
+
+    def test_change_feed(self):
+        # add_project/modify_project record changes, a slot keeps its ID across edits
+        mgr = ProjectManager()
+        mgr.projects = []
+        mgr.pop_changes()
+        mgr.add_project(self.proj1)
+        edited = Project("Solar Demo", "Solar", "New South Wales", "Sydney, NSW",
+                         "$3.00m", "$5.55m", "01/01/2023 – 31/12/2024")
+        mgr.modify_project(0, edited)
+        mgr.modify_project(0, edited)   # no change, no event
+        mgr.modify_project(0, self.proj2)
+        changes = mgr.pop_changes()
+        self.assertEqual([c['op'] for c in changes], ['added', 'modified', 'modified'])
+        self.assertEqual({c['id'] for c in changes}, {self.proj1.project_id()})
+        self.assertEqual(changes[1]['project']['Funding'], "$3.00m")
+        self.assertEqual(changes[2]['project']['Name'], self.proj2.name)
+        self.assertEqual(mgr.changes, [])
+
+        mgr.add_project(self.proj1)
+        self.assertEqual(mgr.export_changes(self.test_txt + '.gz'), 1)
+        with open_text(self.test_txt + '.gz') as f:
+            self.assertEqual(json.loads(f.readline())['op'], 'added')
+
+    def test_change_feed_uses_stored_hashes(self):
+        # In-place edits are noticed, and a failed export keeps the pending changes
+        mgr = ProjectManager()
+        mgr.projects = []
+        mgr.add_project(self.proj1)
+        mgr.pop_changes()
+        mgr.projects[0].funding = "$9.99m"
+        mgr.modify_project(0, mgr.projects[0])
+        self.assertEqual([c['op'] for c in mgr.changes], ['modified'])
+        self.assertEqual(mgr.changes[0]['project']['Funding'], "$9.99m")
+        with self.assertRaises(Exception):
+            mgr.export_changes(os.path.join("missing_dir", "feed.jsonl"))
+        self.assertEqual(len(mgr.changes), 1)
+
+    def test_project_id_survives_edits_and_saves(self):
+        # A period edit keeps the ID, which is saved so snapshot diffs match on it
+        mgr = ProjectManager()
+        mgr.projects = []
+        mgr.add_project(self.proj1)
+        mgr.add_project(self.proj2)
+        mgr.json_file = self.test_json
+        mgr.save_json()
+        pid = self.proj1.project_id()
+        moved = Project("Solar Demo", "Solar", "New South Wales", "Sydney, NSW",
+                        "$2.25m", "$5.55m", "01/03/2023 – 31/12/2024")
+        mgr.pop_changes()
+        mgr.modify_project(0, moved)
+        self.assertEqual([(c['op'], c['id']) for c in mgr.pop_changes()], [('modified', pid)])
+        mgr.json_file = self.test_json + '.gz'
+        mgr.save_json()
+        changes = list(diff_snapshots(self.test_json, mgr.json_file))
+        self.assertEqual([(c['op'], c['id']) for c in changes], [('modified', pid)])
+
+        mgr.projects = []
+        mgr.load_json()
+        self.assertEqual(mgr.projects[0].project_id(), pid)
+
+        # Swapping in another list of the same length re-tracks its records
+        mgr.projects = [self.proj2, self.proj1]
+        mgr.modify_project(0, mgr.projects[0])
+        self.assertEqual(mgr.pop_changes(), [])
+
+    def test_diff_snapshots_similar_projects(self):
+        # Projects sharing a name, location and year still get their own IDs
+        twin = Project("Solar Demo", "Storage", "New South Wales", "Sydney, NSW",
+                       "$1.00m", "$2.00m", "01/07/2023 – 31/12/2023")
+        self.assertEqual(twin.fingerprint(), self.proj1.fingerprint())
+        self.assertNotEqual(twin.project_id(), self.proj1.project_id())
+        mgr = ProjectManager()
+        mgr.projects = [self.proj1, twin]
+        mgr.json_file = self.test_json
+        mgr.save_json()
+        self.assertEqual(list(diff_snapshots(self.test_json, self.test_json)), [])
+        mgr.projects = [self.proj1]
+        mgr.json_file = self.test_json + '.gz'
+        mgr.save_json()
+        changes = list(diff_snapshots(self.test_json, mgr.json_file))
+        self.assertEqual([(c['op'], c['id']) for c in changes], [('removed', twin.project_id())])
+
+    def test_diff_snapshots(self):
+        # Diffing two snapshot files reports only what changed
+        mgr = ProjectManager()
+        mgr.projects = [self.proj1, self.proj2]
+        mgr.json_file = self.test_json
+        mgr.save_json()
+        new_proj = Project("Wind Demo", "Wind", "Victoria", "Geelong, VIC",
+                           "$1.00m", "$2.00m", "01/01/2024 – 31/12/2024")
+        edited = BiomethaneProject("BioGas Future", "Biomethane", "Victoria", "Melbourne, VIC",
+                                   "$2.09m", "$4.58m", "01/06/2022 – 30/06/2025", co2_output="900t")
+        mgr.projects = [edited, new_proj]
+        mgr.json_file = self.test_json + '.gz'
+        mgr.save_json()
+
+        changes = {c['id']: c['op'] for c in diff_snapshots(self.test_json, mgr.json_file)}
+        self.assertEqual(changes, {
+            self.proj1.project_id(): 'removed',
+            self.proj2.project_id(): 'modified',
+            new_proj.project_id(): 'added',
+        })
+        self.assertEqual(list(diff_snapshots(self.test_json, self.test_json)), [])
+
+    def test_top_projects(self):
+        # Top/bottom k overall and per group
+        mgr = ProjectManager()
+        proj3 = Project("Hydro Demo", "Hydro", "Victoria", "Ballarat, VIC",
+                        "$4.00m", "$4.00m", "01/01/2023 – 31/01/2023")
+        bad = Project("Broken", "Hydro", "Victoria", "Ballarat, VIC",
+                      "unknown", "$0.00m", "01/01/2023 – 31/01/2023")
+        mgr.projects = [self.proj1, self.proj2, proj3, bad]
+        self.assertEqual(mgr.top_projects('funding', k=2), [proj3, self.proj1])
+        self.assertEqual(mgr.top_projects('funding_ratio', k=1, bottom=True), [self.proj1])
+        self.assertEqual(mgr.top_projects('duration', k=5, bottom=True),
+                         [proj3, bad, self.proj1, self.proj2])
+        by_state = mgr.top_projects('total_cost', k=1, group_by='state')
+        self.assertEqual(by_state, {"new south wales": [self.proj1], "victoria": [self.proj2]})
+        proj3.state = "victoria"    # same group whatever the case
+        self.assertEqual(mgr.top_projects('funding', k=5, group_by='state')["victoria"],
+                         [proj3, self.proj2])
+        with self.assertRaises(ValueError):
+            mgr.top_projects('name')
+
+    def test_top_projects_cached_scores_follow_edits(self):
+        # Cached scores are updated by add_project/modify_project, edits in place included
+        mgr = ProjectManager()
+        mgr.projects = [self.proj1, self.proj2]
+        self.assertEqual(mgr.top_projects('funding', k=1), [self.proj1])
+        mgr.projects[1].funding = "$9.00m"
+        mgr.modify_project(1, mgr.projects[1])
+        self.assertEqual(mgr.top_projects('funding', k=1), [self.proj2])
+        cheap = Project("Cheap", "Solar", "Victoria", "Geelong, VIC",
+                        "$0.10m", "$0.20m", "01/01/2023 – 31/12/2023")
+        mgr.add_project(cheap)
+        self.assertEqual(mgr.top_projects('funding', k=1, bottom=True), [cheap])
+
+    def test_approx_stats_follow_add_and_modify(self):
+        # Sketches are updated by add_project/modify_project
+        mgr = ProjectManager()
+        mgr.projects = []
+        mgr.rebuild_stats(seed=1)
+        mgr.add_project(self.proj1)
+        mgr.add_project(self.proj2)
+        mgr.modify_project(0, self.proj2)
+        self.assertEqual(mgr.stats.category_count("biomethane")[0], 2)
+        self.assertEqual(mgr.stats.category_count("Solar")[0], 0)
+        self.assertEqual(mgr.stats.state_count("Victoria")[0], 2)
+        # Everything is in the sample, so the breakdown is exact
+        self.assertEqual(mgr.stats.breakdown('state'), {"victoria": (2, 0)})
+        self.assertEqual(mgr.stats.scale(), 1)
+        # An edit made in place moves the counts too
+        mgr.projects[1].state = "Queensland"
+        mgr.modify_project(1, mgr.projects[1])
+        self.assertEqual(mgr.stats.state_count("Victoria")[0], 1)
+        self.assertEqual(mgr.stats.state_count("Queensland")[0], 1)
+
+    def test_approx_stats_built_on_request_after_load(self):
+        # Loading skips the sketches, they are built from the loaded list when asked for
+        mgr = ProjectManager()
+        mgr.projects = [self.proj1, self.proj2]
+        mgr.json_file = self.test_json
+        mgr.save_json()
+        mgr.rebuild_stats(seed=3)
+        mgr.load_json()
+        self.assertEqual(mgr.stats.count, 4)
+        self.assertEqual(mgr.stats.category_count("Solar")[0], 2)
+        self.assertEqual(mgr.stats_options, {'seed': 3})
+
+    def test_approx_stats_sampling_and_sketches(self):
+        # Estimates on a larger stream stay within their reported error
+        stats = ApproxStats(sample_size=200, seed=7)
+        projs = []
+        for i in range(5000):
+            projs.append(Project(f"P{i}", "Solar" if i % 5 else "Wind", "Victoria" if i % 2 else "Queensland",
+                                 f"Town {i % 700}, VIC", "$1.00m", "$2.00m", "01/01/2020 – 31/12/2020"))
+            stats.add(projs[-1])
+        self.assertEqual(len(stats.sample.items), 200)
+        self.assertEqual(stats.scale(), 25)
+        wind, err = stats.category_count("Wind")
+        self.assertTrue(1000 <= wind <= 1000 + err)
+        distinct, err = stats.distinct_locations()
+        self.assertLess(abs(distinct - 700), err)
+        for state, (estimate, err) in stats.breakdown('state').items():
+            self.assertLess(abs(estimate - 2500), err)
+        # Replacing a sampled project swaps it in place
+        old = stats.sample.items[5]
+        new = Project("New", "Wind", "Queensland", "Town 1, VIC", "$1.00m", "$2.00m",
+                      "01/01/2020 – 31/12/2020")
+        stats.replace(projs.index(old), old, new)
+        self.assertIs(stats.sample.items[5], new)
+        self.assertEqual(stats.sample.slots[id(new)], 5)
+        self.assertNotIn(id(old), stats.sample.slots)
+        hll = HyperLogLog()
+        self.assertEqual(hll.count(), 0)
+
 if __name__ == "__main__":
     unittest.main()